@@ -3,15 +3,21 @@ Set of tools for the sampling of paleomagnetic data
 
 This includes the following modules:
     - .kappa       : Calculation of parameters of the Fisher distribution
+    - .secular     : Sampling of secular variation from the TK03 giant Gaussian process model
     - .sampling    : Random sampling of paleopoles and samples in the sphere simulating a paleomagnetic study
     - .estimate    : Estimation of paleopole using Fisher means and secular variation
     - .theoretical : Theoretical calculations based on (Sapienza et al 2023)
+    - .storage     : Reading and writing simulation tables in typed binary formats (Parquet, Feather, npz)
+    - .sweep       : Command line sweeps over a grid of parameters (`smpsite-sweep config.yaml`)
 """
 
 __version__ = "1.0.0"
-__all__ = ["estimate", "sampling", "kappa", "theoretical"]
+__all__ = ["estimate", "sampling", "kappa", "secular", "theoretical", "storage", "sweep"]
 
 from .kappa import *
+from .secular import *
 from .sampling import *
 from .estimate import *
 from .theoretical import *
+from .storage import *
+from . import sweep
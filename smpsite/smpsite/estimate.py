@@ -5,8 +5,9 @@ from sklearn.metrics.pairwise import haversine_distances
 import pmagpy.pmag as pmag
 import pmagpy.ipmag as ipmag
 
-from .kappa import lat_correction, kappa2angular, kappa_from_latitude
-from .sampling import generate_samples
+from .kappa import lat_correction, kappa2angular
+from .sampling import generate_samples, site_table
+from .secular import tk03_directions
 
 import warnings 
 warnings.filterwarnings('default')
@@ -59,7 +60,7 @@ def robust_fisher_mean(decs, incs):
                 'n_samples': pole_mean['n'], 
                 'resultant_length': pole_mean['r']}
 
-def S2_within_site(resultant_length, n_samples, lat, degrees=True):
+def S2_within_site(resultant_length, n_samples, lat, degrees=True, correction=None):
     """
     Calculate within-site dispersion (S^2) for sample directions.
     
@@ -68,6 +69,8 @@ def S2_within_site(resultant_length, n_samples, lat, degrees=True):
         n_samples (int): Number of samples within the site.
         lat (float): Latitude of the site.
         degrees (bool, optional): If True, latitude is in degrees. Default is True.
+        correction (float, optional): Precomputed value of `lat_correction(lat)`, for example from `site_table()`. 
+            If given, `lat` is ignored. Default is None.
         
     Returns:
         float: Calculated within-site dispersion (S^2).
@@ -79,10 +82,12 @@ def S2_within_site(resultant_length, n_samples, lat, degrees=True):
         return 0.0
     k_wi = (n_samples - 1) / (n_samples - resultant_length)
     assert k_wi >= 0.0
-    return 2 * (180 / np.pi) ** 2 * lat_correction(lat, degrees=degrees) / k_wi 
+    if correction is None:
+        correction = lat_correction(lat, degrees=degrees)
+    return 2 * (180 / np.pi) ** 2 * correction / k_wi 
 
 
-def estimate_pole(df_sample, params, ignore_outliers):
+def estimate_pole(df_sample, params, ignore_outliers, sites=None):
     """
     Calculate the paleomagnetic pole using sample data (grouped by site) and a specified outlier strategy.
     
@@ -90,6 +95,8 @@ def estimate_pole(df_sample, params, ignore_outliers):
         df_sample (pd.DataFrame): Sample data containing sample directional data and is_outlier column.
         params (object): Configuration parameters for the sampling strategy.
         ignore_outliers (str): Strategy to handle outliers ("True", "False", or "vandamme").
+        sites (pd.DataFrame, optional): Table of sites returned by `site_table(params)`. Computed 
+            from params if not provided. Default is None.
         
     Returns:
         dict: Dictionary containing:
@@ -116,13 +123,18 @@ def estimate_pole(df_sample, params, ignore_outliers):
         df = df_sample
     
     
+    if sites is None:
+        sites = site_table(params)
+    
     df_site = df.groupby('sample_site').apply(lambda row : pd.Series(robust_fisher_mean(row.vgp_dec.values, row.vgp_inc.values)))
+    df_site = df_site.join(sites[['site_lat', 'site_long', 'lat_correction']])
     
     # Within site dispersion 
     df_site["S2_within"] = df_site.apply(lambda row: S2_within_site(row.resultant_length,
                                                                     row.n_samples,
-                                                                    params.site_lat, 
-                                                                    degrees=True), axis=1)
+                                                                    row.site_lat, 
+                                                                    degrees=True,
+                                                                    correction=row.lat_correction), axis=1)
     df_site["S2_within_norm"] = df_site["S2_within"] / df_site["n_samples"]
     S2_within_total = np.mean(df_site.S2_within_norm.values) 
     
@@ -130,8 +142,8 @@ def estimate_pole(df_sample, params, ignore_outliers):
     vgp_long, vgp_lat, _, _ = pmag.dia_vgp(df_site.vgp_dec, 
                                            df_site.vgp_inc, 
                                            0, 
-                                           params.site_lat, 
-                                           params.site_long)
+                                           df_site.site_lat, 
+                                           df_site.site_long)
  
     df_site["vgp_long"] = vgp_long
     df_site["vgp_lat"]  = vgp_lat
@@ -163,8 +175,210 @@ def estimate_pole(df_sample, params, ignore_outliers):
             "alpha95": pole_alpha95}
     
 
+
+def _dir2cart(dec, inc):
+    """
+    Unit vectors of directions (or poles) given in degrees, stacked in the last axis.
+    """
+    dec, inc = np.radians(dec), np.radians(inc)
+    return np.stack([np.cos(inc) * np.cos(dec), np.cos(inc) * np.sin(dec), np.sin(inc)], axis=-1)
+
+
+def _cart2dir(X):
+    """
+    Declination and inclination (in degrees) of the vectors stacked in the last axis of X.
+    """
+    dec = np.degrees(np.arctan2(X[..., 1], X[..., 0])) % 360.0
+    inc = np.degrees(np.arcsin(np.clip(X[..., 2] / np.linalg.norm(X, axis=-1), -1.0, 1.0)))
+    return dec, inc
+
+
+def _mean_site_location(sites):
+    """
+    Mean location of the sites, computed from the mean of their unit vectors so it is well defined across 
+    the 0/360 meridian. The coordinates are returned unchanged when all sites are at the same location.
+    """
+    if np.all(sites.site_lat.values == sites.site_lat.values[0]) and np.all(sites.site_long.values == sites.site_long.values[0]):
+        return sites.site_lat.values[0], sites.site_long.values[0]
+    site_long, site_lat = _cart2dir(np.sum(_dir2cart(sites.site_long.values, sites.site_lat.values), axis=0))
+    return site_lat, site_long
+
+
+def _pole_from_sites(S, n_samples, correction, site_lat, site_long, N, resampled_within=False, keep=None):
+    """
+    Vectorized version of the estimator in estimate_pole() working on the sum of the unit vectors of each site.
+    All the arguments have the site in the last axis (before the cartesian coordinates of S), and any number 
+    of leading axes (e.g. bootstrap draws).
+    
+    As in estimate_pole(), the within site dispersion is averaged over all the sites, while only the VGPs 
+    of the sites where keep is True (e.g. retained by the Vandamme cutoff) enter the pole and S2_total.
+    
+    If resampled_within is True, samples within sites were resampled with replacement. This shrinks n - R by 
+    a factor (n - 1) / n, and adds to each site mean a resampling noise with variance (n - 1) / n^2 times the 
+    within site dispersion. Both are corrected so the bootstrap is centered on the original estimate.
+    """
+    R = np.linalg.norm(S, axis=-1)
+    n_minus_R = n_samples - R
+    if resampled_within:
+        n_minus_R = n_minus_R * n_samples / np.maximum(n_samples - 1, 1)
+    
+    # Within site dispersion, equivalent to S2_within_site() but zero when all samples coincide
+    S2_within = np.where(n_samples > 1, 
+                         2 * (180 / np.pi) ** 2 * correction * n_minus_R / np.maximum(n_samples - 1, 1), 
+                         0.0)
+    if resampled_within:
+        S2_within_total = np.mean(S2_within * (2 * n_samples - 1) / n_samples ** 2, axis=-1)
+    else:
+        S2_within_total = np.mean(S2_within / n_samples, axis=-1)
+    
+    site_dec, site_inc = _cart2dir(S)
+    vgp_long, vgp_lat, _, _ = pmag.dia_vgp(site_dec, site_inc, 0, site_lat, site_long)
+    
+    if keep is None:
+        keep = np.ones(vgp_lat.shape, dtype=bool)
+    
+    V = _dir2cart(vgp_long, vgp_lat)
+    pole = np.sum(V * keep[..., None], axis=-2)
+    pole_long, pole_lat = _cart2dir(pole)
+    
+    # Angular distance between VGPs and the estimated pole
+    cos_delta = np.sum(V * pole[..., None, :], axis=-1) / np.linalg.norm(pole, axis=-1)[..., None]
+    Delta_pole = np.degrees(np.arccos(np.clip(cos_delta, -1.0, 1.0)))
+    S2_total = np.sum(Delta_pole ** 2 * keep, axis=-1) / (N - 1)
+    
+    return pole_long, pole_lat, S2_total - S2_within_total
+
+
+def bootstrap_estimates(df_sample, params, ignore_outliers, n_bootstrap=1000, resample_within=False, sites=None, rng=None):
+    """
+    Bootstrap estimates of the paleomagnetic pole and the VGP dispersion.
+    
+    Sites (and optionally samples within each site) are resampled with replacement using index arrays, 
+    and the pole and S2_vgp of all the bootstrap draws are computed in a single vectorized pass with the 
+    same estimator as estimate_pole(), so resampling each site exactly once reproduces its result. 
+    
+    Args:
+        df_sample (pd.DataFrame): Sample data containing sample directional data and is_outlier column.
+        params (object): Configuration parameters for the sampling strategy.
+        ignore_outliers (str): Strategy to handle outliers ("True", "False", or "vandamme"). With "vandamme", 
+            the cutoff is applied once to the VGPs of the original data. All the sites are resampled and enter the 
+            within site dispersion, but only the VGPs of the retained sites enter the pole and S2_total.
+        n_bootstrap (int, optional): Number of bootstrap draws. Default is 1000.
+        resample_within (bool, optional): If True, samples within each resampled site are also resampled, 
+            and the within site dispersion is corrected for the resampling. When outliers are kept within 
+            sites ("False" or "vandamme"), repeated draws of an outlier dominate the site means and the 
+            resulting intervals are very wide. Default is False.
+        sites (pd.DataFrame, optional): Table of sites returned by `site_table(params)`. Default is None.
+        rng (np.random.Generator, optional): Random generator used for resampling, independent of the global 
+            `np.random` state used to simulate data. Defaults to a new `np.random.default_rng()`.
+        
+    Returns:
+        dict: Dictionary containing arrays of length n_bootstrap:
+            - pole_dec (np.ndarray): Longitude of the bootstrap poles.
+            - pole_inc (np.ndarray): Latitude of the bootstrap poles.
+            - S2_vgp (np.ndarray): Bootstrap VGP dispersion.
             
-def simulate_estimations(params, n_iters=100, ignore_outliers="False", seed=None):
+    Raises:
+        AssertionError: If provided outlier strategy is not supported.
+        NoPointsForMean: If there are no samples to resample.
+    """
+    
+    assert ignore_outliers in ["True", "False", "vandamme"], "Ignore outlier method is not supported."
+    
+    if sites is None:
+        sites = site_table(params)
+    
+    if ignore_outliers == "True":        
+        df = df_sample[df_sample.is_outlier==0]
+    else:
+        df = df_sample
+        
+    if df.shape[0] == 0:
+        raise NoPointsForMean("No points to compute the mean")
+    
+    # Padded array with the unit vectors of the samples in each site
+    site_id, site_index = np.unique(df.sample_site.values, return_inverse=True)
+    position = df.groupby('sample_site').cumcount().values
+    n_samples = np.bincount(site_index)
+    X = np.zeros((len(site_id), n_samples.max(), 3))
+    X[site_index, position] = _dir2cart(df.vgp_dec.values, df.vgp_inc.values)
+    
+    correction = sites.lat_correction.values[site_id]
+    site_lat   = sites.site_lat.values[site_id]
+    site_long  = sites.site_long.values[site_id]
+    
+    # Flag sites based on the VGPs of the original data using the Vandamme method
+    keep = np.ones(len(site_id), dtype=bool)
+    if ignore_outliers == "vandamme":
+        site_dec, site_inc = _cart2dir(np.sum(X, axis=1))
+        _, vgp_lat, _, _ = pmag.dia_vgp(site_dec, site_inc, 0, site_lat, site_long)
+        df_vgp, _, _ = pmag.dovandamme(pd.DataFrame({'vgp_lat': vgp_lat}))
+        keep = np.isin(np.arange(len(site_id)), df_vgp.index.values)
+        
+    n_sites, n_max = X.shape[0], X.shape[1]
+    
+    if rng is None:
+        rng = np.random.default_rng()
+    idx = rng.integers(0, n_sites, size=(n_bootstrap, n_sites))
+    n_idx = n_samples[idx]
+    
+    if resample_within:
+        picks = (rng.uniform(size=(n_bootstrap, n_sites, n_max)) * n_idx[..., None]).astype(int)
+        mask = np.arange(n_max) < n_idx[..., None]
+        S = np.sum(X[idx[..., None], picks] * mask[..., None], axis=2)
+    else:
+        S = np.sum(X, axis=1)[idx]
+        
+    pole_dec, pole_inc, S2_vgp = _pole_from_sites(S, n_idx, correction[idx], site_lat[idx], site_long[idx], params.N, 
+                                                  resampled_within=resample_within, keep=keep[idx])
+    
+    return {"pole_dec": pole_dec, 
+            "pole_inc": pole_inc, 
+            "S2_vgp": S2_vgp}
+
+
+def bootstrap_pole(df_sample, params, ignore_outliers, n_bootstrap=1000, resample_within=False, 
+                   confidence=0.95, pole_estimate=None, sites=None, rng=None):
+    """
+    Bootstrap confidence regions for the paleomagnetic pole and the VGP dispersion.
+    
+    Args:
+        df_sample (pd.DataFrame): Sample data containing sample directional data and is_outlier column.
+        params (object): Configuration parameters for the sampling strategy.
+        ignore_outliers (str): Strategy to handle outliers ("True", "False", or "vandamme").
+        n_bootstrap (int, optional): Number of bootstrap draws. Default is 1000.
+        resample_within (bool, optional): If True, samples within each resampled site are also resampled. 
+            Default is False.
+        confidence (float, optional): Confidence level of the bounds. Default is 0.95.
+        pole_estimate (dict, optional): Output of estimate_pole() for the same data, used as the center of 
+            the confidence region. Computed if not provided. Default is None.
+        sites (pd.DataFrame, optional): Table of sites returned by `site_table(params)`. Default is None.
+        rng (np.random.Generator, optional): Random generator used for resampling. Default is None.
+        
+    Returns:
+        dict: Dictionary containing:
+            - alpha95_bootstrap (float): Angle around the estimated pole containing a fraction `confidence` 
+              of the bootstrap poles.
+            - S2_vgp_lower (float): Lower bound of the percentile interval of S2_vgp.
+            - S2_vgp_upper (float): Upper bound of the percentile interval of S2_vgp.
+    """
+    
+    if pole_estimate is None:
+        pole_estimate = estimate_pole(df_sample, params, ignore_outliers=ignore_outliers, sites=sites)
+    
+    estimates = bootstrap_estimates(df_sample, params, ignore_outliers, n_bootstrap=n_bootstrap, 
+                                    resample_within=resample_within, sites=sites, rng=rng)
+    
+    cos_delta = np.sum(_dir2cart(estimates["pole_dec"], estimates["pole_inc"]) * 
+                       _dir2cart(pole_estimate["pole_dec"], pole_estimate["pole_inc"]), axis=-1)
+    Delta_pole = np.degrees(np.arccos(np.clip(cos_delta, -1.0, 1.0)))
+    
+    return {"alpha95_bootstrap": np.quantile(Delta_pole, confidence), 
+            "S2_vgp_lower": np.quantile(estimates["S2_vgp"], (1 - confidence) / 2), 
+            "S2_vgp_upper": np.quantile(estimates["S2_vgp"], (1 + confidence) / 2)}
+
+            
+def simulate_estimations(params, n_iters=100, ignore_outliers="False", seed=None, n_bootstrap=0, resample_within=False):
     """
     Simulate the estimation of paleomagnetic poles over multiple iterations using specified parameters.
     
@@ -182,6 +396,11 @@ def simulate_estimations(params, n_iters=100, ignore_outliers="False", seed=None
             Defaults to "False".
         seed (int, optional): Seed for random number generator. If specified, ensures 
             reproducibility. Default is None.
+        n_bootstrap (int, optional): Number of bootstrap draws per iteration. If positive, the bounds 
+            returned by bootstrap_pole() are added as columns. Resampling uses its own random generator 
+            derived from seed, so the simulated data does not depend on the bootstrap options. Default is 0.
+        resample_within (bool, optional): If True, the bootstrap also resamples samples within sites. 
+            Default is False.
         
     Returns:
         pd.DataFrame: DataFrame containing the simulated pole estimates over the iterations.
@@ -190,46 +409,70 @@ def simulate_estimations(params, n_iters=100, ignore_outliers="False", seed=None
     """
     
     poles = {'plong':[], 'plat':[], 'total_samples':[], 'samples_per_sites':[], 'S2_vgp': [] }
+    if n_bootstrap > 0:
+        poles.update({'alpha95_bootstrap': [], 'S2_vgp_lower': [], 'S2_vgp_upper': []})
     
     if seed is not None:
         np.random.seed(seed)
     
+    rng_bootstrap = np.random.default_rng(seed)
+    
+    # Latitude-dependent quantities are computed once for all the iterations
+    sites = site_table(params)
+    
     _iter = 0 
+    _attempt = 0
+    
+    # Directions of TK03 are drawn in chunks of iterations, with at most 1e5 directions per chunk
+    _chunk = max(1, min(n_iters, 100000 // params.N))
     
     while _iter < n_iters:
 
-        df_sample = generate_samples(params)
+        if params.secular_method == "tk03":
+            if _attempt % _chunk == 0:
+                dec_tk03, inc_tk03 = tk03_directions(sites.site_lat.values, params.N, size=_chunk)
+            directions_secular = (dec_tk03[_attempt % _chunk], inc_tk03[_attempt % _chunk])
+        else:
+            directions_secular = None
+        _attempt += 1
+
+        df_sample = generate_samples(params, directions_secular=directions_secular, sites=sites)
 
         try:
-            pole_estimate = estimate_pole(df_sample, params, ignore_outliers=ignore_outliers)
+            pole_estimate = estimate_pole(df_sample, params, ignore_outliers=ignore_outliers, sites=sites)
+            if n_bootstrap > 0:
+                pole_bootstrap = bootstrap_pole(df_sample, params, ignore_outliers, n_bootstrap=n_bootstrap, 
+                                                resample_within=resample_within, pole_estimate=pole_estimate, sites=sites, 
+                                                rng=rng_bootstrap)
             _iter += 1
         except NoPointsForMean:
             warnings.warn("No points to compute mean in one simulation.")
+            continue
             
         poles['plong'].append(pole_estimate["pole_dec"])
         poles['plat'].append(pole_estimate["pole_inc"])
         poles['total_samples'].append(pole_estimate["total_samples"])
         poles['samples_per_sites'].append(pole_estimate["samples_per_site"])
         poles['S2_vgp'].append(pole_estimate["S2_vgp"])
+        
+        if n_bootstrap > 0:
+            for key, value in pole_bootstrap.items():
+                poles[key].append(value)
 
     df_poles = pd.DataFrame(poles)
     
     df_poles['error_angle'] = 90.0 - df_poles.plat
     
-    # Add real secular variation of VGPs
-    if params.secular_method == 'G':
-        _kappa_secular = kappa_from_latitude(params.site_lat, degrees=True)
-    elif params.secular_method == 'Fisher':
-        _kappa_secular = params.kappa_secular
-    df_poles['S2_vgp_real'] = kappa2angular(_kappa_secular) ** 2
+    # Add real secular variation of VGPs, averaged over sites
+    df_poles['S2_vgp_real'] = np.mean(kappa2angular(sites.kappa_secular.values) ** 2)
     
-    # Add all parameters to simulation to keep track of them
+    # Add all parameters to simulation to keep track of them. 
+    # For studies with sites at different locations, the spherical mean of the site coordinates is reported
     df_poles['n_tot'] = params.N * params.n0
     df_poles['N'] = params.N
     df_poles['n0'] = params.n0
     df_poles['kappa_within_site'] = params.kappa_within_site
-    df_poles['site_lat'] = params.site_lat
-    df_poles['site_long'] = params.site_long
+    df_poles['site_lat'], df_poles['site_long'] = _mean_site_location(sites)
     df_poles['outlier_rate'] = params.outlier_rate
     df_poles['secular_method'] = params.secular_method
     df_poles['kappa_secular'] = params.kappa_secular
@@ -273,6 +516,11 @@ def summary_simulations(df_tot):
     
     df['error_vgp_scatter'] = np.mean( (df_tot['S2_vgp'] ** .5 - df_tot['S2_vgp_real'] ** .5 ) ** 2 ) ** .5
     
+    # Coverage of the bootstrap confidence regions, if computed in simulate_estimations()
+    if 'alpha95_bootstrap' in df_tot.columns:
+        df['alpha95_bootstrap_coverage'] = np.mean(df_tot.error_angle <= df_tot.alpha95_bootstrap)
+        df['S2_vgp_bootstrap_coverage'] = np.mean((df_tot.S2_vgp_lower <= df_tot.S2_vgp_real) & (df_tot.S2_vgp_real <= df_tot.S2_vgp_upper))
+    
     # Add parameters to the final simulation table
     
     for attribute in ['n_tot', 'N', 'n0', 'kappa_within_site', 'site_lat', 'site_long', 'outlier_rate', 'secular_method', 'kappa_secular', 'ignore_outliers']:
@@ -0,0 +1,15 @@
+import numpy as np
+import pandas as pd
+from smpsite.secular import tk03_angular_dispersion_sample
+
+all_lats = np.linspace(0, 90, 37)
+all_stds = []
+
+for lat in all_lats:
+
+    angular_std = tk03_angular_dispersion_sample(float(lat), n=200000)
+    all_stds.append(angular_std)
+
+
+df = pd.DataFrame({'lat': all_lats, 'std_angular': all_stds})
+df.to_csv("tk03_angular.csv")
@@ -4,11 +4,11 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 
 import pmagpy.pmag as pmag
-import pmagpy.ipmag as ipmag
 
 from typing import NamedTuple
 
 from .kappa import *
+from .secular import tk03_directions, tk03_angular_dispersion
 
 class Params(NamedTuple):
     """
@@ -23,7 +23,7 @@ class Params(NamedTuple):
     # Concentration parameter within site
     kappa_within_site : float    
 
-    # Latitude and longitude of site
+    # Latitude and longitude of site. Can also be arrays of length N with the coordinates of each site
     site_lat  : float 
     site_long : float
 
@@ -47,89 +47,119 @@ def generate_design(params):
     assert np.min(equal_template) >= params.n0
     assert np.max(equal_template) <= params.n0
     return equal_template
+
+
+def site_table(params):
+    '''
+    Table with the coordinates of each site and the latitude-dependent quantities used for 
+    sampling and estimation, so they are computed once per study instead of once per sample
+    
+    Arguments:
+        - params 
+    Returns:
+        - DataFrame indexed by site with columns site_lat, site_long, lat_correction and kappa_secular
+    '''
+    site_lat  = np.broadcast_to(np.asarray(params.site_lat, dtype=float), (params.N,))
+    site_long = np.broadcast_to(np.asarray(params.site_long, dtype=float), (params.N,))
+    
+    if params.secular_method=="G":
+        kappa_secular = kappa_from_latitude(site_lat, degrees=True)
+    elif params.secular_method=="Fisher":
+        kappa_secular = params.kappa_secular
+    elif params.secular_method=="tk03":
+        kappa_secular = [float(angular2kappa(tk03_angular_dispersion(float(lat)))) for lat in site_lat]
+    else:
+        raise ValueError("Method for sampling secular variation not implemented.")
+    
+    return pd.DataFrame({'site_lat': site_lat,
+                         'site_long': site_long,
+                         'lat_correction': lat_correction(site_lat, degrees=True),
+                         'kappa_secular': np.broadcast_to(np.asarray(kappa_secular, dtype=float), (params.N,))})
         
     
-def generate_samples(params):
+def generate_samples(params, directions_secular=None, sites=None):
     '''
     Fuction to generate experimental design 
     
     Arguments:
         - params 
+        - directions_secular : Optional tuple (dec, inc) with the mean direction of each site, for example 
+                               drawn for many replicates at once with tk03_directions()
+        - sites : Optional table of sites returned by site_table(params)
     Returns:
         - List of number of samples needed to take per site
     '''
     
     design = generate_design(params)
+    
+    if sites is None:
+        sites = site_table(params)
+    site_lat, site_long = sites.site_lat.values, sites.site_long.values
 
-    if params.secular_method=="tk03":
-        directions_secular = ipmag.tk03(n=params.N.k, dec=0, lat=params.site_lat, rev='no', G1=-18e3, G2=0, G3=0, B_threshold=0)
-        dec_secular, inc_secular = np.asarray(directions_secular)[:,0], np.asarray(directions_secular)[:,1]
+    if directions_secular is not None:
+        dec_secular, inc_secular = directions_secular
+    
+    elif params.secular_method=="tk03":
+        dec_secular, inc_secular = tk03_directions(site_lat, params.N)
     
     elif params.secular_method=="G" or params.secular_method=="Fisher":
 
-        # Pick value of kappa used for Fisher sampling
-        if params.secular_method=="G":
-            _kappa_secular = float(kappa_from_latitude(params.site_lat, degrees=True))
-        if params.secular_method=="Fisher":
-            _kappa_secular = params.kappa_secular
-
-        directional_secular = ipmag.fishrot(k=_kappa_secular, 
-                                            n=params.N,
-                                            dec=0,
-                                            inc=90,
-                                            di_block=True)
+        # One VGP per site around the spin axis, with the value of kappa of the site, all drawn in one call
+        vgp_long_secular, vgp_lat_secular = np.atleast_1d(*pmag.fshdev(sites.kappa_secular.values))
 
         # Transform to inclination, declination
-        vgp_secular = np.apply_along_axis(lambda x: pmag.vgp_di(x[1], x[0], slat=params.site_lat, slong=params.site_long), axis=1, arr = directional_secular)
-        dec_secular, inc_secular = vgp_secular[:,0], vgp_secular[:,1]
+        dec_secular, inc_secular = _vgp_di(vgp_lat_secular, vgp_long_secular, site_lat, site_long)
         
         assert np.min(inc_secular) > -90 and np.max(inc_secular) < 90, "Inclination must be [-90, 90]"
 
     else:
         raise ValueError("Method for sampling secular variation not implemented.")
         
+    # Site of each sample
+    sample_site = np.repeat(np.arange(len(design)), design)
+    n_total = len(sample_site)
+
+    # Pick samples to be outliers, and arrange the true samples and then the outliers inside each site
+    outliers = np.random.binomial(1, params.outlier_rate, n_total)
+    outliers = outliers[np.lexsort((outliers, sample_site))]
+    is_outlier = outliers == 1
     
-    for i, nk in enumerate(design):
-        """
-        i is a counter representing the site number.
-        nk is the number of samples in the i_th site
-        """
-
-        # Pick samples to be outliers
-        outliers = np.random.binomial(1, params.outlier_rate, nk) 
-        # Arrange the true samples and then the outliers
-        outliers = sorted(outliers)
-        
-        n_outliers = np.sum(outliers)     # Number of outliers
-        n_samples  = nk - n_outliers      # Number of real samples
-        
-        # Sample in-site observations
-        declinations, inclinations = ipmag.fishrot(k=params.kappa_within_site, 
-                                                   n=n_samples,
-                                                   dec=dec_secular[i],
-                                                   inc=inc_secular[i],
-                                                   di_block=False)
-
-        # Sample VGP outliers in (dec, inc) space
-        vgp_dec_out, vgp_inc_out = pmag.get_unf(n_outliers).T
-        
-        samples_dec = np.hstack((declinations, vgp_dec_out))
-        samples_inc = np.hstack((inclinations, vgp_inc_out))   
+    # Sample in-site observations around (0, 90) and rotate them to the direction of their site
+    dec_within, inc_within = np.atleast_1d(*pmag.fshdev(np.full(n_total, float(params.kappa_within_site))))
+    samples_dec, samples_inc = pmag.dotilt_V(np.column_stack((dec_within, 
+                                                              inc_within, 
+                                                              dec_secular[sample_site] - 180., 
+                                                              90. - inc_secular[sample_site])))
+    samples_dec = (samples_dec - 180.) % 360.
+
+    # Sample VGP outliers in (dec, inc) space
+    if np.any(is_outlier):
+        samples_dec[is_outlier], samples_inc[is_outlier] = pmag.get_unf(np.sum(is_outlier)).T
+
+    # Convert specimen/sample/directions to VGP space, with the coordinates of the site of each sample
+    vgp_long, vgp_lat, _, _ = pmag.dia_vgp(samples_dec, samples_inc, 0, site_lat[sample_site], site_long[sample_site])
+    
+    return pd.DataFrame({'sample_site': sample_site,
+                         'vgp_long': vgp_long,
+                         'vgp_lat': vgp_lat,
+                         'vgp_dec': samples_dec,
+                         'vgp_inc': samples_inc,
+                         'is_outlier': outliers})
 
-        samples_vgp = np.vstack((samples_dec, samples_inc)).T         
 
-        # Convert specimen/sample/directions to VGP space
-        samples_dia = np.apply_along_axis(lambda x: pmag.dia_vgp(x[0], x[1], 0, params.site_lat, params.site_long), axis=1, arr = samples_vgp)[:,:2]  
-        
-        df_ = pd.DataFrame({'sample_site': i,
-                            'vgp_long': samples_dia[:,0],
-                            'vgp_lat': samples_dia[:,1],
-                            'vgp_dec': samples_dec,
-                            'vgp_inc': samples_inc,
-                            'is_outlier': outliers})
-        if i==0:
-            df = df_
-        else:
-            df = pd.concat([df, df_], axis=0, ignore_index=True)
-            
-    return df
+def _vgp_di(plat, plong, slat, slong):
+    '''
+    Vectorized version of pmag.vgp_di(). Direction (dec, inc) of a dipolar field at the sites 
+    (slat, slong) for the poles (plat, plong). All arguments are in degrees and can be arrays
+    '''
+    plat, plong, slat, slong = np.radians(plat), np.radians(plong), np.radians(slat), np.radians(slong)
+    delta_long = plong - slong
+    
+    # Angular distance from site to pole and azimuth of the pole seen from the site
+    cos_p = np.sin(slat) * np.sin(plat) + np.cos(slat) * np.cos(plat) * np.cos(delta_long)
+    sin_p = np.sqrt(np.clip(1 - cos_p ** 2, 0, None))
+    dec = np.arctan2(np.cos(plat) * np.sin(delta_long), 
+                     np.cos(slat) * np.sin(plat) - np.sin(slat) * np.cos(plat) * np.cos(delta_long))
+    inc = np.arctan2(2 * cos_p, sin_p)
+    
+    return np.degrees(dec) % 360., np.degrees(inc)
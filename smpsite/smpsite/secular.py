@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+import pathlib
+from functools import lru_cache
+from scipy import interpolate
+from scipy.special import lpmv
+
+import pmagpy.pmag as pmag
+
+_file_location = pathlib.Path(__file__).parent.joinpath("kappa_tabular/tk03_angular.csv")
+_df_tk03 = pd.read_csv(_file_location, header=0)
+
+_tk03_angular = interpolate.interp1d(_df_tk03.lat, _df_tk03.std_angular)
+
+
+@lru_cache(maxsize=None)
+def tk03_coefficients(terms=8, G2=0.0, G3=0.0, g10=-18e3, beta=3.8, afact=2.4):
+    """
+    Table with the mean and standard deviation of the Gauss coefficients of the TK03 model.
+
+    Coefficients are ordered as in `pmag.mktk03()`, that is g_1^0, g_1^1, h_1^1, g_2^0, g_2^1, h_2^1, ...
+    The table is cached, so repeated calls with the same arguments are free.
+
+    Args:
+        terms (int, optional): Maximum degree of the spherical harmonic expansion. Defaults to 8.
+        G2 (float, optional): Ratio of the axial quadrupole term to the dipole term. Defaults to 0.
+        G3 (float, optional): Ratio of the axial octupole term to the dipole term. Defaults to 0.
+        g10 (float, optional): Mean axial dipole term (nT). Defaults to -18e3.
+        beta (float, optional): Ratio between the standard deviations of the dipole and quadrupole families. Defaults to 3.8.
+        afact (float, optional): Ratio between g10 and the alpha parameter of CP88. Defaults to 2.4.
+
+    Returns:
+        tuple: Arrays (degree, order, is_h, mean, std), one entry per Gauss coefficient.
+
+    References:
+        - Tauxe, L., & Kent, D. V. (2004). A simplified statistical model for the geomagnetic field and the
+          detection of shallow bias in paleomagnetic inclinations: Was the ancient magnetic field dipolar?
+          Geophysical Monograph Series, 145, 101–115. https://doi.org/10.1029/145GM08
+    """
+    alpha = g10 / afact
+    degree, order, is_h, mean, std = [], [], [], [], []
+
+    for l in range(1, terms + 1):
+        for m in range(l + 1):
+            s = pmag.s_l(l, alpha=alpha)
+            # Terms in the dipole family have their variance amplified by beta
+            if (l - m) % 2 == 1:
+                s = s * beta
+            offset = 0.0
+            if m == 0:
+                offset = {1: g10, 2: G2 * g10, 3: G3 * g10}.get(l, 0.0)
+            for h in ([False] if m == 0 else [False, True]):
+                degree.append(l)
+                order.append(m)
+                is_h.append(h)
+                mean.append(0.0 if h else offset)
+                std.append(s)
+
+    return np.array(degree), np.array(order), np.array(is_h), np.array(mean), np.array(std)
+
+
+@lru_cache(maxsize=None)
+def schmidt_legendre(lat, terms=8):
+    """
+    Evaluate the Schmidt semi-normalized associated Legendre functions at a given site latitude.
+
+    Values are cached per latitude, so sampling many replicates at the same site only evaluates
+    the Legendre functions once.
+
+    Args:
+        lat (float): Latitude of the site in degrees.
+        terms (int, optional): Maximum degree of the expansion. Defaults to 8.
+
+    Returns:
+        tuple: Arrays (P, dP, mP_sin) indexed by [l, m], with the Legendre functions, their derivative
+               with respect to colatitude, and m * P / sin(colatitude).
+    """
+    theta = np.radians(90.0 - lat)
+    x = np.cos(theta)
+
+    # Unnormalized functions without the Condon-Shortley phase, including degree terms+1 for the recurrences
+    P_ = np.zeros((terms + 2, terms + 3))
+    for l in range(terms + 2):
+        for m in range(l + 1):
+            P_[l, m] = (-1) ** m * lpmv(m, l, x)
+
+    P, dP, mP_sin = np.zeros((3, terms + 1, terms + 1))
+    for l in range(1, terms + 1):
+        for m in range(l + 1):
+            if m == 0:
+                norm = 1.0
+                dP_ = - P_[l, 1]
+            else:
+                norm = np.sqrt(2.0 / np.prod(np.arange(l - m + 1, l + m + 1, dtype=float)))
+                dP_ = 0.5 * ((l + m) * (l - m + 1) * P_[l, m - 1] - P_[l, m + 1])
+                # m P_l^m / sin(theta), written without dividing by sin(theta) so it is finite at the poles
+                mP_sin[l, m] = 0.5 * norm * (P_[l + 1, m + 1] + (l - m + 1) * (l - m + 2) * P_[l + 1, m - 1])
+            P[l, m] = norm * P_[l, m]
+            dP[l, m] = norm * dP_
+
+    return P, dP, mP_sin
+
+
+def tk03_directions(lat, n, size=None, G2=0.0, G3=0.0, terms=8, rng=None):
+    """
+    Sample field directions from the TK03 giant Gaussian process model of secular variation.
+
+    Directions for all sites and all replicates are drawn at once: Gauss coefficients are sampled
+    from the precomputed variance table of `tk03_coefficients()`, and the field is synthesized using
+    the cached Legendre functions of `schmidt_legendre()` at each site latitude and a random longitude.
+    Coefficients are contracted per order m, so memory grows as size * n * (number of coefficients).
+
+    Args:
+        lat (float or np.ndarray): Latitude of the site(s) in degrees. Either a scalar or an array of length n.
+        n (int): Number of directions (sites) per replicate.
+        size (int, optional): Number of replicates. If None, a single replicate is drawn. Defaults to None.
+        G2 (float, optional): Ratio of the axial quadrupole term to the dipole term. Defaults to 0.
+        G3 (float, optional): Ratio of the axial octupole term to the dipole term. Defaults to 0.
+        terms (int, optional): Maximum degree of the expansion. Defaults to 8.
+        rng (np.random.Generator, optional): Random generator. Defaults to the global `np.random` state.
+
+    Returns:
+        tuple: Arrays (dec, inc) in degrees, with shape (n,) if size is None and (size, n) otherwise.
+    """
+    _size = 1 if size is None else size
+    rng = np.random if rng is None else rng
+    lat = np.broadcast_to(np.asarray(lat, dtype=float), (n,))
+
+    degree, order, is_h, mean, std = tk03_coefficients(terms, G2, G3)
+    gh = mean + std * rng.normal(size=(_size, n, len(mean)))
+
+    # Legendre functions for each coefficient, evaluated once per distinct latitude
+    lat_unique, lat_index = np.unique(lat, return_inverse=True)
+    tables = [schmidt_legendre(float(_lat), terms) for _lat in lat_unique]
+    P, dP, mP_sin = [np.array([table[k][degree, order] for table in tables])[lat_index] for k in range(3)]
+
+    # Weights of each coefficient in the (X, Y, Z) components, split by order m and by g/h terms
+    W = np.stack([dP, mP_sin, - (degree + 1) * P])[..., None] * (order[:, None] == np.arange(terms + 1))
+    C_g = np.einsum('rnk,cnkm->crnm', gh, W * ~is_h[:, None])
+    C_h = np.einsum('rnk,cnkm->crnm', gh, W * is_h[:, None])
+
+    phi = rng.uniform(0, 2 * np.pi, size=(_size, n, 1))
+    cos_mphi, sin_mphi = np.cos(np.arange(terms + 1) * phi), np.sin(np.arange(terms + 1) * phi)
+
+    X = np.sum(cos_mphi * C_g[0] + sin_mphi * C_h[0], axis=-1)
+    Y = np.sum(sin_mphi * C_g[1] - cos_mphi * C_h[1], axis=-1)
+    Z = np.sum(cos_mphi * C_g[2] + sin_mphi * C_h[2], axis=-1)
+
+    dec = np.degrees(np.arctan2(Y, X)) % 360.0
+    inc = np.degrees(np.arctan2(Z, np.sqrt(X ** 2 + Y ** 2)))
+
+    if size is None:
+        return dec[0], inc[0]
+    return dec, inc
+
+
+def tk03_angular_dispersion(lat, G2=0.0, G3=0.0):
+    """
+    Angular dispersion of VGPs around the spin axis under the TK03 model at a given latitude.
+
+    There is no closed form for this quantity. For the default model (G2 = G3 = 0), it is interpolated
+    from a table precomputed with `tk03_angular_dispersion_sample()` (see kappa_tabular/create_tk03_table.py),
+    which is symmetric in latitude. Otherwise it is estimated with `tk03_angular_dispersion_sample()`.
+
+    Args:
+        lat (float): Latitude of the site in degrees.
+        G2 (float, optional): Ratio of the axial quadrupole term to the dipole term. Defaults to 0.
+        G3 (float, optional): Ratio of the axial octupole term to the dipole term. Defaults to 0.
+
+    Returns:
+        float: Angular standard deviation of the VGPs (in degrees).
+    """
+    if G2 == 0.0 and G3 == 0.0:
+        return float(_tk03_angular(np.abs(lat)))
+    return tk03_angular_dispersion_sample(float(lat), G2, G3)
+
+
+@lru_cache(maxsize=None)
+def tk03_angular_dispersion_sample(lat, G2=0.0, G3=0.0, n=100000, seed=0, chunk=10000):
+    """
+    Monte Carlo estimate of the angular dispersion of VGPs around the spin axis under the TK03 model.
+
+    Directions are drawn with `tk03_directions()` in chunks, using a random generator with a fixed seed
+    so the global random state is not modified. Results are cached per latitude.
+
+    Args:
+        lat (float): Latitude of the site in degrees.
+        G2 (float, optional): Ratio of the axial quadrupole term to the dipole term. Defaults to 0.
+        G3 (float, optional): Ratio of the axial octupole term to the dipole term. Defaults to 0.
+        n (int, optional): Number of directions used in the estimation. Defaults to 100000.
+        seed (int, optional): Seed used for the estimation. Defaults to 0.
+        chunk (int, optional): Number of directions drawn at a time. Defaults to 10000.
+
+    Returns:
+        float: Angular standard deviation of the VGPs (in degrees).
+    """
+    rng = np.random.default_rng(seed)
+    sum_squares = 0.0
+    for start in range(0, n, chunk):
+        dec, inc = tk03_directions(lat, min(chunk, n - start), G2=G2, G3=G3, rng=rng)
+        _, vgp_lat, _, _ = pmag.dia_vgp(dec, inc, 0, lat, 0)
+        sum_squares += np.sum((90.0 - np.asarray(vgp_lat)) ** 2)
+    return float(np.sqrt(sum_squares / n))
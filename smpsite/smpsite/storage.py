@@ -0,0 +1,147 @@
+import pathlib
+import uuid
+
+import numpy as np
+import pandas as pd
+
+
+# Suffix of the arrays with the categories of dictionary-encoded columns in .npz files
+CATEGORIES_SUFFIX = "__categories"
+# Name of the array with the order of the columns in .npz files
+COLUMNS_KEY = "__columns__"
+
+
+def encode_columns(df):
+    """
+    Prepare a table produced by `simulate_estimations()` or `summary_simulations()` for typed storage.
+
+    Columns of strings (e.g., secular_method, ignore_outliers) are dictionary-encoded as categoricals,
+    and columns of Python objects holding numbers (e.g., kappa_secular=None) are converted to floats.
+
+    Args:
+        df (pd.DataFrame): Table to encode.
+
+    Returns:
+        pd.DataFrame: Copy of the table with encoded columns and a default index.
+    """
+    df = df.reset_index(drop=True)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        if pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col]):
+            try:
+                df[col] = pd.to_numeric(df[col])
+            except (ValueError, TypeError):
+                df[col] = df[col].astype(str).astype("category")
+    return df
+
+
+def _write_npz(df, path):
+    """
+    Write a table to a .npz file, storing categorical columns as integer codes plus their categories.
+    """
+    arrays = {COLUMNS_KEY: np.asarray(df.columns, dtype=str)}
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            arrays[col] = df[col].cat.codes.to_numpy()
+            arrays[col + CATEGORIES_SUFFIX] = np.asarray(df[col].cat.categories, dtype=str)
+        else:
+            arrays[col] = df[col].to_numpy()
+    np.savez(path, **arrays)
+
+
+def _read_npz(path):
+    """
+    Read a table written by `_write_npz()`.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        columns = {}
+        for col in data[COLUMNS_KEY]:
+            if col + CATEGORIES_SUFFIX in data.files:
+                columns[col] = pd.Categorical.from_codes(data[col], categories=data[col + CATEGORIES_SUFFIX])
+            else:
+                columns[col] = data[col]
+    return pd.DataFrame(columns)
+
+
+def write_table(df, path):
+    """
+    Write a table of simulations to disk.
+
+    The format is given by the extension of the file: `.parquet` and `.feather` (require pyarrow),
+    `.npz` (only requires numpy) and `.csv`. In the binary formats, string columns are dictionary-encoded.
+
+    Args:
+        df (pd.DataFrame): Table to write, for example the output of `simulate_estimations()`.
+        path (str): Path of the output file.
+    """
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if path.suffix == ".csv":
+        df.to_csv(path, index=False)
+        return
+
+    df = encode_columns(df)
+    if path.suffix == ".parquet":
+        df.to_parquet(path, index=False)
+    elif path.suffix == ".feather":
+        df.to_feather(path)
+    elif path.suffix == ".npz":
+        _write_npz(df, path)
+    else:
+        raise ValueError("Format {} not supported. Options are .parquet, .feather, .npz and .csv".format(path.suffix))
+
+
+def append_table(df, path, suffix=".npz"):
+    """
+    Append a table of simulations to a dataset stored in a directory.
+
+    Each call writes a new part file with a unique name inside the directory, so many workers
+    can append to the same dataset at the same time without locks. The dataset is read back with `read_table()`.
+
+    Args:
+        df (pd.DataFrame): Table to append.
+        path (str): Directory of the dataset. Created if it does not exist.
+        suffix (str, optional): Format of the part file (see `write_table()`). Defaults to ".npz".
+
+    Returns:
+        pathlib.Path: Path of the part file written.
+    """
+    path = pathlib.Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    part = path.joinpath("part-{}{}".format(uuid.uuid4().hex, suffix))
+    write_table(df, part)
+    return part
+
+
+def read_table(path):
+    """
+    Read a table written by `write_table()`, or all the parts of a dataset written by `append_table()`.
+
+    Args:
+        path (str): Path of a file or of a dataset directory.
+
+    Returns:
+        pd.DataFrame: Table with dictionary-encoded columns as categoricals.
+    """
+    path = pathlib.Path(path)
+
+    if path.is_dir():
+        parts = sorted(path.glob("part-*"))
+        if len(parts) == 0:
+            raise FileNotFoundError("No part files in dataset {}".format(path))
+        # Categories can differ between parts, so the columns are encoded again after concatenation
+        df = pd.concat([read_table(part) for part in parts], ignore_index=True)
+        return encode_columns(df)
+
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    elif path.suffix == ".feather":
+        return pd.read_feather(path)
+    elif path.suffix == ".npz":
+        return _read_npz(path)
+    elif path.suffix == ".csv":
+        return pd.read_csv(path)
+    else:
+        raise ValueError("Format {} not supported. Options are .parquet, .feather, .npz and .csv".format(path.suffix))
@@ -0,0 +1,217 @@
+import argparse
+import json
+import os
+import pathlib
+import time
+import warnings
+from functools import partial
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from .sampling import Params
+from .estimate import simulate_estimations, summary_simulations
+from .storage import write_table, append_table
+
+
+# Parameters of each cell in the grid, in the same order as in notebooks/Parallel.ipynb
+GRID_KEYS = ['N', 'n0', 'kappa_within_site', 'site_lat', 'site_long', 'outlier_rate',
+             'secular_method', 'kappa_secular', 'ignore_outliers']
+
+GRID_DEFAULTS = {'kappa_within_site': 50,
+                 'site_lat': 30.0,
+                 'site_long': 0.0,
+                 'outlier_rate': 0.0,
+                 'secular_method': "G",
+                 'kappa_secular': np.nan,
+                 'ignore_outliers': "False"}
+
+
+def read_config(path):
+    """
+    Read the declarative configuration of a sweep from a YAML or JSON file.
+
+    The configuration has the following entries:
+        - grid (dict): Values of each parameter in `Params` plus `ignore_outliers`. Each value can be
+            a scalar, a list, or a dictionary {start, stop, step} that is expanded with `np.arange()`.
+            Missing parameters take the values in `GRID_DEFAULTS`.
+        - n_simulations (int): Number of simulations per cell of the grid.
+        - min_n, max_n (int, optional): Only cells with min_n <= N * n0 <= max_n are simulated.
+        - seed (int, optional): Seed used to draw the seed of each cell.
+        - n_bootstrap (int, optional): Number of bootstrap draws per simulation (see `bootstrap_pole()`). Defaults to 0.
+        - resample_within (bool, optional): If True, the bootstrap also resamples samples within sites. Defaults to False.
+        - output (str): Path of the output file. The format is given by the extension (see `write_table()`).
+        - output_replicates (str, optional): Directory where the results of each simulation are appended 
+            (see `append_table()`). If missing, only the summary of each cell is kept.
+        - workers (int, optional): Number of processes in the local pool.
+
+    Args:
+        path (str): Path to a `.yaml`/`.yml` or `.json` file.
+
+    Returns:
+        dict: Configuration of the sweep.
+    """
+    path = pathlib.Path(path)
+    with open(path) as f:
+        if path.suffix in [".yaml", ".yml"]:
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Reading YAML configurations requires pyyaml. Install it with `pip install pyyaml` or use a JSON file.")
+            config = yaml.safe_load(f)
+        else:
+            config = json.load(f)
+
+    for key in ["grid", "n_simulations", "output"]:
+        if key not in config:
+            raise KeyError("Missing entry '{}' in sweep configuration.".format(key))
+    unknown = set(config["grid"]) - set(GRID_KEYS)
+    if unknown:
+        raise KeyError("Unknown grid parameters: {}".format(sorted(unknown)))
+    return config
+
+
+def _grid_values(value):
+    """
+    Expand the specification of one grid parameter into a list of values.
+    """
+    if isinstance(value, dict):
+        return list(np.arange(value["start"], value["stop"], value.get("step", 1)))
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return list(value)
+    return [value]
+
+
+def build_grid(config):
+    """
+    Build the table with all the cells of the sweep from a configuration.
+
+    Args:
+        config (dict): Configuration of the sweep, as returned by `read_config()`.
+
+    Returns:
+        pd.DataFrame: One row per cell, with the parameters of the simulation, the seed, `n_sim` and the bootstrap options.
+    """
+    grid = {key: _grid_values(config["grid"].get(key, GRID_DEFAULTS.get(key))) for key in GRID_KEYS}
+    # YAML reads True/False as booleans, but estimate_pole() expects strings
+    grid['ignore_outliers'] = [str(value) for value in grid['ignore_outliers']]
+    grid['kappa_secular'] = [np.nan if value is None else value for value in grid['kappa_secular']]
+
+    df_grid = pd.MultiIndex.from_product([grid[key] for key in GRID_KEYS], names=GRID_KEYS).to_frame(index=False)
+
+    n_tot = df_grid.N * df_grid.n0
+    valid_index = (config.get("min_n", 1) <= n_tot) & (n_tot <= config.get("max_n", np.inf))
+    df_grid = df_grid[valid_index].reset_index(drop=True)
+
+    rng = np.random.default_rng(config.get("seed", None))
+    df_grid["seed"] = rng.integers(0, 2**32 - 1, df_grid.shape[0])
+    df_grid["n_sim"] = config["n_simulations"]
+    df_grid["n_bootstrap"] = config.get("n_bootstrap", 0)
+    df_grid["resample_within"] = config.get("resample_within", False)
+
+    return df_grid
+
+
+def run_cell(cell, output_replicates=None):
+    """
+    Run the simulations of one cell of the grid and summarize them.
+
+    Args:
+        cell (dict): Row of the table returned by `build_grid()`.
+        output_replicates (str, optional): Directory where the results of each simulation are appended. Defaults to None.
+
+    Returns:
+        pd.DataFrame: Output of `summary_simulations()` with the seed and the time (in seconds) of the cell.
+    """
+    start = time.perf_counter()
+
+    params = Params(**{key: cell[key] for key in GRID_KEYS if key != 'ignore_outliers'})
+    df_tot = simulate_estimations(params,
+                                  n_iters=int(cell['n_sim']),
+                                  ignore_outliers=cell['ignore_outliers'],
+                                  seed=int(cell['seed']),
+                                  n_bootstrap=int(cell.get('n_bootstrap', 0)),
+                                  resample_within=bool(cell.get('resample_within', False)))
+    if output_replicates is not None:
+        df_tot['seed'] = cell['seed']
+        append_table(df_tot, output_replicates)
+    df = summary_simulations(df_tot)
+    df['seed'] = cell['seed']
+    df['time'] = time.perf_counter() - start
+    return df
+
+
+def run_sweep(config, workers=None, progress=True, output=None):
+    """
+    Run all the cells of a sweep on a local pool of processes.
+
+    Args:
+        config (dict): Configuration of the sweep, as returned by `read_config()`.
+        workers (int, optional): Number of processes. Defaults to the value in the configuration,
+            or to the number of CPUs if missing. With one worker, cells are run in the current process.
+        progress (bool, optional): If True, show a progress bar with the timing of each cell. Defaults to True.
+        output (str, optional): Path where the summary is written (see `write_table()`). If a cell fails, the pool
+            is terminated and the cells already finished are written next to it with a `.partial` suffix
+            before raising the error. Defaults to None.
+
+    Returns:
+        pd.DataFrame: Summary of all the cells, with one row per cell.
+    """
+    df_grid = build_grid(config)
+    cells = df_grid.to_dict(orient="records")
+    _run_cell = partial(run_cell, output_replicates=config.get("output_replicates", None))
+
+    if workers is None:
+        workers = config.get("workers", os.cpu_count())
+
+    results = []
+    try:
+        with tqdm(total=len(cells), disable=not progress) as pbar:
+
+            def _collect(outputs):
+                for df in outputs:
+                    results.append(df)
+                    pbar.set_postfix(N=int(df.N[0]), n0=int(df.n0[0]), time="{:.1f}s".format(df.time[0]))
+                    pbar.update()
+
+            if workers == 1:
+                _collect(map(_run_cell, cells))
+            else:
+                # Leaving the context terminates the pool, so queued cells are not run after an error
+                with Pool(processes=workers) as pool:
+                    _collect(pool.imap(_run_cell, cells))
+    except BaseException:
+        if output is not None and len(results) > 0:
+            path = pathlib.Path(output)
+            path_partial = path.with_name(path.stem + ".partial" + path.suffix)
+            write_table(pd.concat(results, ignore_index=True), path_partial)
+            warnings.warn("Sweep failed, {} of {} cells written to {}".format(len(results), len(cells), path_partial))
+        raise
+
+    df = pd.concat(results, ignore_index=True)
+    if output is not None:
+        write_table(df, output)
+    return df
+
+
+def main(argv=None):
+    """
+    Entry point of the `smpsite-sweep` command.
+    """
+    parser = argparse.ArgumentParser(description="Run a sweep of paleomagnetic sampling simulations.")
+    parser.add_argument("config", help="YAML or JSON file with the configuration of the sweep")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="number of processes in the local pool")
+    parser.add_argument("-o", "--output", default=None, help="output file, overrides the one in the configuration")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not show progress")
+    args = parser.parse_args(argv)
+
+    config = read_config(args.config)
+    output = args.output or config["output"]
+
+    start = time.perf_counter()
+    df = run_sweep(config, workers=args.workers, progress=not args.quiet, output=output)
+
+    if not args.quiet:
+        print("{} cells written to {} in {:.1f}s".format(df.shape[0], output, time.perf_counter() - start))
@@ -51,4 +51,80 @@ def test_simulate():
     _df = smp.simulate_estimations(params0, n_iters=10, ignore_outliers="True", seed=666)
     assert _df.shape == (10,17)
     for col in ['plong', 'plat', 'S2_vgp', 'error_angle']:
-        assert col in _df.columns
\ No newline at end of file
+        assert col in _df.columns
+
+def test_simulate_multi_site():
+    params_multi = params0._replace(site_lat=np.linspace(-20, 40, 10), site_long=np.linspace(0, 30, 10))
+    _df = smp.simulate_estimations(params_multi, n_iters=10, ignore_outliers="False", seed=666)
+    assert _df.shape == (10,17)
+    assert_allclose(_df.site_lat[0], 10.0, atol=1.0)
+    assert_allclose(_df.S2_vgp_real[0], np.mean(smp.kappa2angular(smp.site_table(params_multi).kappa_secular) ** 2))
+    # Mean longitude of sites across the 0/360 meridian
+    params_meridian = params0._replace(site_lat=30, site_long=np.array([350, 355, 0, 5, 10] * 2))
+    _df = smp.simulate_estimations(params_meridian, n_iters=2, ignore_outliers="False", seed=666)
+    assert_allclose(np.cos(np.radians(_df.site_long[0])), 1.0)
+
+def test_bootstrap_estimates():
+    df = pd.read_csv('./smpsite/smpsite/test/data/df1.csv')
+    _rng = np.random.default_rng(666)
+    for ignore_outliers in ["True", "False", "vandamme"]:
+        for resample_within in [False, True]:
+            _res = smp.bootstrap_estimates(df, params0, ignore_outliers, n_bootstrap=200, resample_within=resample_within, rng=_rng)
+            for key in ['pole_dec', 'pole_inc', 'S2_vgp']:
+                assert _res[key].shape == (200,)
+                assert np.all(np.isfinite(_res[key]))
+
+class _IdentityRng:
+    """
+    Generator that resamples each site exactly once, in order.
+    """
+    def integers(self, low, high, size):
+        return np.broadcast_to(np.arange(high), size)
+
+def test_bootstrap_identity():
+    # Resampling each site once reproduces estimate_pole(), including sites rejected by the Vandamme cutoff
+    params_outliers = params0._replace(N=30, n0=4, outlier_rate=0.15, site_lat=30)
+    for seed in [3, 7, 11]:
+        np.random.seed(seed)
+        _df = smp.generate_samples(params_outliers)
+        for ignore_outliers in ["True", "False", "vandamme"]:
+            _estimate = smp.estimate_pole(_df, params_outliers, ignore_outliers=ignore_outliers)
+            _res = smp.bootstrap_estimates(_df, params_outliers, ignore_outliers, n_bootstrap=2, rng=_IdentityRng())
+            assert_allclose(_res['S2_vgp'], _estimate['S2_vgp'])
+            assert_allclose(_res['pole_inc'], _estimate['pole_inc'])
+            assert_allclose(np.cos(np.radians(_res['pole_dec'] - _estimate['pole_dec'])), 1.0)
+
+def test_bootstrap_pole():
+    df = pd.read_csv('./smpsite/smpsite/test/data/df1.csv')
+    params_large = params0._replace(N=100, kappa_within_site=50, site_lat=30)
+    np.random.seed(2)
+    df_large = smp.generate_samples(params_large)
+    for _df, _params in [(df, params0), (df_large, params_large)]:
+        for ignore_outliers in ["True", "False", "vandamme"]:
+            _estimate = smp.estimate_pole(_df, _params, ignore_outliers=ignore_outliers)
+            _res = smp.bootstrap_pole(_df, _params, ignore_outliers=ignore_outliers, n_bootstrap=2000, 
+                                      pole_estimate=_estimate, rng=np.random.default_rng(666))
+            assert 0 < _res['alpha95_bootstrap'] < 90
+            # Resampling sites is centered on the point estimate of S2_vgp
+            assert _res['S2_vgp_lower'] < _estimate['S2_vgp'] < _res['S2_vgp_upper']
+        # Resampling within sites is only centered when outliers are removed within sites
+        _estimate = smp.estimate_pole(_df, _params, ignore_outliers="True")
+        _res = smp.bootstrap_pole(_df, _params, ignore_outliers="True", n_bootstrap=2000, resample_within=True, 
+                                  pole_estimate=_estimate, rng=np.random.default_rng(666))
+        assert _res['S2_vgp_lower'] < _estimate['S2_vgp'] < _res['S2_vgp_upper']
+
+def test_simulate_bootstrap():
+    _df = smp.simulate_estimations(params0._replace(kappa_secular=np.nan), n_iters=10, ignore_outliers="True", seed=666, n_bootstrap=100)
+    assert _df.shape == (10,20)
+    for col in ['alpha95_bootstrap', 'S2_vgp_lower', 'S2_vgp_upper']:
+        assert col in _df.columns
+    _summary = smp.summary_simulations(_df)
+    assert 0 <= _summary.alpha95_bootstrap_coverage[0] <= 1
+
+def test_simulate_bootstrap_same_data():
+    # The bootstrap does not change the simulated data
+    _params = params0._replace(kappa_secular=np.nan)
+    _df0 = smp.simulate_estimations(_params, n_iters=5, ignore_outliers="True", seed=3)
+    _df1 = smp.simulate_estimations(_params, n_iters=5, ignore_outliers="True", seed=3, n_bootstrap=50, resample_within=True)
+    assert_allclose(_df0.S2_vgp, _df1.S2_vgp)
+    assert_allclose(_df0.plat, _df1.plat)
@@ -25,3 +25,19 @@ def test_sample():
     for col in ['sample_site', 'vgp_long', 'vgp_lat', 'vgp_dec', 'vgp_inc', 'is_outlier']:
         assert col in _df.columns
     
+
+def test_site_table():
+    _sites = smp.site_table(params0)
+    assert _sites.shape == (10, 4)
+    assert np.all(_sites.site_lat == 10)
+    params_multi = params0._replace(site_lat=np.linspace(-20, 40, 10), site_long=np.linspace(0, 30, 10))
+    _sites = smp.site_table(params_multi)
+    assert_allclose(_sites.lat_correction, smp.lat_correction(np.linspace(-20, 40, 10)))
+    assert_allclose(_sites.kappa_secular[0], smp.kappa_from_latitude(-20, degrees=True))
+
+def test_sample_multi_site():
+    params_multi = params0._replace(site_lat=np.linspace(-20, 40, 10), site_long=np.linspace(0, 30, 10))
+    _df = smp.generate_samples(params_multi)
+    assert _df.shape == (50,6)
+    # VGPs of each site should scatter around the spin axis
+    assert np.mean(_df[_df.is_outlier==0].vgp_lat) > 45
@@ -0,0 +1,53 @@
+import smpsite as smp
+import numpy as np
+import pmagpy.pmag as pmag
+from numpy.testing import assert_allclose
+
+params_tk03 = smp.Params(N=10,
+                         n0=5,
+                         kappa_within_site=100,
+                         site_lat=30,
+                         site_long=0,
+                         outlier_rate=0.10,
+                         secular_method="tk03",
+                         kappa_secular=None)
+
+def test_tk03_coefficients():
+    degree, order, is_h, mean, std = smp.tk03_coefficients()
+    # 8 degrees give 80 Gauss coefficients
+    assert len(mean) == 80
+    assert_allclose(mean[0], -18e3)
+    assert np.all(mean[1:] == 0.0)
+    assert_allclose(std[0], 3.8 * std[1])
+
+def test_schmidt_legendre_field():
+    # Compare field directions against the IGRF synthesis of pmagpy for fixed Gauss coefficients
+    degree, order, is_h, mean, std = smp.tk03_coefficients()
+    gh = mean + std * np.linspace(-1, 1, len(mean))
+    lat, lon = 45.0, 37.0
+    x, y, z, _ = pmag.magsyn(list(gh) + [0.0] * 40, [0.0] * 120, 2000., 2000., 2, 6371.2, 90 - lat, lon)
+
+    P, dP, mP_sin = smp.schmidt_legendre(lat)
+    phi = np.radians(lon)
+    gh_cos = np.where(is_h, gh * np.sin(order * phi), gh * np.cos(order * phi))
+    gh_sin = np.where(is_h, - gh * np.cos(order * phi), gh * np.sin(order * phi))
+    assert_allclose(np.sum(gh_cos * dP[degree, order]), x, rtol=1e-4)
+    assert_allclose(np.sum(gh_sin * mP_sin[degree, order]), y, rtol=1e-4)
+    assert_allclose(- np.sum((degree + 1) * gh_cos * P[degree, order]), z, rtol=1e-4)
+
+def test_tk03_directions():
+    dec, inc = smp.tk03_directions(30.0, 10)
+    assert dec.shape == (10,) and inc.shape == (10,)
+    dec, inc = smp.tk03_directions(30.0, 10, size=20)
+    assert dec.shape == (20, 10)
+    assert np.all((dec >= 0) & (dec < 360)) and np.all(np.abs(inc) <= 90)
+
+def test_simulate_tk03():
+    _df = smp.simulate_estimations(params_tk03, n_iters=10, ignore_outliers="True", seed=666)
+    assert _df.shape == (10,17)
+    assert np.all(np.isfinite(_df.S2_vgp_real))
+
+def test_tk03_angular_dispersion():
+    # Tabulated values agree with a new Monte Carlo estimate and are symmetric in latitude
+    assert_allclose(smp.tk03_angular_dispersion(30.0), smp.tk03_angular_dispersion_sample(30.0, n=20000, seed=1), rtol=0.05)
+    assert_allclose(smp.tk03_angular_dispersion(-45.0), smp.tk03_angular_dispersion(45.0))
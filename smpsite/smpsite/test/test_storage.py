@@ -0,0 +1,42 @@
+import smpsite as smp
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+params0 = smp.Params(N=10,
+                     n0=5,
+                     kappa_within_site=100,
+                     site_lat=10, 
+                     site_long=0,
+                     outlier_rate=0.10,
+                     secular_method="G",
+                     kappa_secular=None)
+
+df0 = smp.simulate_estimations(params0, n_iters=5, ignore_outliers="True", seed=666)
+
+def test_encode_columns():
+    _df = smp.encode_columns(df0)
+    assert isinstance(_df.secular_method.dtype, pd.CategoricalDtype)
+    assert isinstance(_df.ignore_outliers.dtype, pd.CategoricalDtype)
+    assert _df.kappa_secular.dtype == np.float64
+
+def test_write_read_npz(tmp_path):
+    smp.write_table(df0, tmp_path / "sim.npz")
+    _df = smp.read_table(tmp_path / "sim.npz")
+    assert_frame_equal(_df, smp.encode_columns(df0))
+
+def test_write_read_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    smp.write_table(df0, tmp_path / "sim.parquet")
+    _df = smp.read_table(tmp_path / "sim.parquet")
+    assert_frame_equal(_df, smp.encode_columns(df0))
+
+def test_append_table(tmp_path):
+    smp.append_table(df0, tmp_path / "dataset")
+    _df1 = df0.copy()
+    _df1['ignore_outliers'] = "vandamme"
+    smp.append_table(_df1, tmp_path / "dataset")
+    _df = smp.read_table(tmp_path / "dataset")
+    assert _df.shape == (10, 17)
+    assert set(_df.ignore_outliers.cat.categories) == {"True", "vandamme"}
@@ -0,0 +1,49 @@
+import json
+import smpsite as smp
+import numpy as np
+import pandas as pd
+import pytest
+
+config0 = {'grid': {'N': [5, 10],
+                    'n0': {'start': 1, 'stop': 4},
+                    'kappa_within_site': 50,
+                    'site_lat': [30.0],
+                    'ignore_outliers': [False]},
+           'n_simulations': 3,
+           'max_n': 20,
+           'seed': 666,
+           'output': 'summary.csv'}
+
+def test_build_grid():
+    _grid = smp.sweep.build_grid(config0)
+    # (5, 1), (5, 2), (5, 3), (10, 1), (10, 2)
+    assert _grid.shape[0] == 5
+    assert np.all(_grid.N * _grid.n0 <= 20)
+    assert np.all(_grid.ignore_outliers == "False")
+    assert np.all(_grid.seed == smp.sweep.build_grid(config0).seed)
+
+def test_main(tmp_path):
+    _config = tmp_path / "config.json"
+    _output = tmp_path / "summary.csv"
+    with open(_config, "w") as f:
+        json.dump(dict(config0, output_replicates=str(tmp_path / "replicates")), f)
+    smp.sweep.main([str(_config), "--workers", "2", "--output", str(_output), "--quiet"])
+    _df = pd.read_csv(_output)
+    assert _df.shape[0] == 5
+    for col in ['error_angle_mean', 'N', 'n0', 'seed', 'time']:
+        assert col in _df.columns
+    assert np.all(_df.total_simulations == 3)
+    _df_replicates = smp.read_table(tmp_path / "replicates")
+    assert _df_replicates.shape[0] == 5 * 3
+    assert set(_df_replicates.seed) == set(_df.seed)
+
+def test_run_sweep_failure(tmp_path):
+    # Cells alternate between a valid and an unsupported outlier strategy, so the second cell fails
+    _config = dict(config0, grid=dict(config0['grid'], ignore_outliers=["True", "bad"]))
+    _output = tmp_path / "summary.csv"
+    with pytest.raises(AssertionError), pytest.warns(UserWarning):
+        smp.sweep.run_sweep(_config, workers=2, progress=False, output=_output)
+    assert not _output.exists()
+    _df = pd.read_csv(tmp_path / "summary.partial.csv")
+    assert _df.shape[0] >= 1
+    assert np.all(_df.ignore_outliers == True)
@@ -1,4 +1,5 @@
 import smpsite as smp
+import numpy as np
 from numpy.testing import assert_allclose
 
 params0 = smp.Params(N=10,
@@ -11,4 +12,11 @@ params0 = smp.Params(N=10,
                      kappa_secular=None)
 
 def test_kappa_theoretical():
-    assert_allclose(smp.kappa_theoretical(params0), 259.0223874154575)
\ No newline at end of file
+    assert_allclose(smp.kappa_theoretical(params0), 259.0223874154575)
+
+def test_kappa_theoretical_multi_site():
+    # Same latitude at all sites gives the single-site result
+    params_multi = params0._replace(site_lat=np.repeat(10.0, 10))
+    assert_allclose(smp.kappa_theoretical(params_multi), smp.kappa_theoretical(params0))
+    params_multi = params0._replace(site_lat=np.linspace(-20, 40, 10))
+    assert smp.kappa_theoretical(params_multi) < smp.kappa_theoretical(params0)
@@ -1,6 +1,7 @@
 import numpy as np
 
-from .kappa import lat_correction, kappa_from_latitude, kappa2angular
+from .kappa import kappa2angular
+from .sampling import site_table
 
 
 def inverse(f, delta=1e-8):
@@ -34,17 +35,19 @@ def rho_kappa(k, n):
 def kappa_theoretical(params):
     """
     Theoretical result
+    
+    For sites at different latitudes, the dispersion of each site is combined by averaging 
+    the angular variance (i.e., the inverse of kappa) over sites.
     """
     
     N = params.N
     n = params.n0
-    if params.secular_method == "G":
-        k_between = kappa_from_latitude(params.site_lat, degrees=True)
-    else:
+    if params.secular_method not in ["G", "tk03"]:
         raise ValueError()
+    sites = site_table(params)
+    k_between = sites.kappa_secular.values
     k_within = params.kappa_within_site
     p = params.outlier_rate
-    lat = params.site_lat
     
     if p > 0.001 and n > 2:
         rho_kappa_inverse = inverse(lambda x: rho_kappa(x, n=2))
@@ -52,11 +55,12 @@ def kappa_theoretical(params):
     
     k_within_site = n * rho_kappa(k_within, n) * k_within 
     
-    k_within_site_lat_corrected = k_within_site / lat_correction(lat, degrees=True)
+    k_within_site_lat_corrected = k_within_site / sites.lat_correction.values
     
     k_between_vgp = k_between 
     
     k_combined = k_within_site_lat_corrected * k_between_vgp / (k_within_site_lat_corrected + k_between_vgp)
+    k_combined = 1 / np.mean(1 / k_combined)
     
     k_tot = N * k_combined * rho_kappa(k_combined, N) #* (1 - p)
         
@@ -78,7 +82,7 @@ def kappa_theoretical(params):
         for n0_ in range(n+1):
             k_within_site =  n0_ * k_within * rho_kappa(k_within, n0_)
         
-            k_within_site_lat_corrected = k_within_site / lat_correction(lat, degrees=True)
+            k_within_site_lat_corrected = k_within_site / sites.lat_correction.values
     
             k_between_vgp = k_between 
 